@@ -0,0 +1,8 @@
+"""Minecraft server-status Discord bot.
+
+The package splits the old single-file bot into:
+- mcbot.config — environment parsing and constants
+- mcbot.core   — queries, embeds, the check loop, and the bot itself
+
+Run with `python -m mcbot` (or the legacy `python bot.py` shim).
+"""
@@ -0,0 +1,3 @@
+from mcbot.core import main
+
+main()
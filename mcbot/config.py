@@ -0,0 +1,87 @@
+"""Environment-based configuration for the status bot.
+
+Environment variables:
+- DISCORD_TOKEN (required)
+- DISCORD_CHANNEL_ID (required) — numeric channel ID
+- MC_SERVER_HOST (default: 23.ip.gl.ply.gg)
+- MC_SERVER_PORT (default: 12696)
+- MC_PROTOCOL (default: auto) — one of: auto, java, bedrock
+- CHECK_INTERVAL (seconds, default: 60) — base poll interval
+- MAX_CHECK_INTERVAL (seconds, default: CHECK_INTERVAL*16) — cap for adaptive backoff
+- STABLE_THRESHOLD (how many consecutive same results before announcing, default: 2)
+- RATE_LIMIT_SECONDS (seconds to fully refill the announce token bucket, default: 300)
+- ANNOUNCE_BURST (token-bucket size, i.e. max burst of announcements, default: 3)
+- USE_EMBED (true/false, default: true)
+- LOG_LEVEL (INFO/DEBUG, default: INFO)
+
+Everything is parsed exactly once into the frozen CONFIG instance below;
+the module-level constants are plain aliases of its fields.
+"""
+import os
+from dataclasses import dataclass
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name))  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return default
+
+def _env_bool(name: str, default: bool) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.lower() in ("1", "true", "yes", "y", "on")
+
+
+@dataclass(frozen=True)
+class Config:
+    token: str
+    channel_id: int
+    host: str
+    port: int
+    protocol: str  # auto/java/bedrock
+    check_interval: int
+    max_check_interval: int
+    stable_threshold: int
+    rate_limit_seconds: int
+    announce_burst: int
+    use_embed: bool
+    log_level: str
+
+
+def _load_config() -> Config:
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        raise SystemExit("DISCORD_TOKEN environment variable is required")
+    check_interval = _env_int("CHECK_INTERVAL", 60)
+    return Config(
+        token=token,
+        channel_id=_env_int("DISCORD_CHANNEL_ID", 1437964841263304795),
+        host=os.getenv("MC_SERVER_HOST", "23.ip.gl.ply.gg"),
+        port=_env_int("MC_SERVER_PORT", 12696),
+        protocol=os.getenv("MC_PROTOCOL", "auto").lower(),
+        check_interval=check_interval,
+        max_check_interval=_env_int("MAX_CHECK_INTERVAL", check_interval * 16),
+        stable_threshold=_env_int("STABLE_THRESHOLD", 2),
+        rate_limit_seconds=_env_int("RATE_LIMIT_SECONDS", 300),
+        announce_burst=_env_int("ANNOUNCE_BURST", 3),
+        use_embed=_env_bool("USE_EMBED", True),
+        log_level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    )
+
+
+CONFIG = _load_config()
+
+TOKEN = CONFIG.token
+CHANNEL_ID = CONFIG.channel_id
+MC_SERVER_HOST = CONFIG.host
+MC_SERVER_PORT = CONFIG.port
+MC_PROTOCOL = CONFIG.protocol
+CHECK_INTERVAL = CONFIG.check_interval
+MAX_CHECK_INTERVAL = CONFIG.max_check_interval
+STABLE_THRESHOLD = CONFIG.stable_threshold
+RATE_LIMIT_SECONDS = CONFIG.rate_limit_seconds
+ANNOUNCE_BURST = CONFIG.announce_burst
+USE_EMBED = CONFIG.use_embed
+LOG_LEVEL = CONFIG.log_level
@@ -0,0 +1,601 @@
+"""Query protocols, embeds, the check loop, and the Discord bot itself.
+
+See mcbot.config for the environment variables that drive everything here.
+"""
+import asyncio
+import copy
+import json
+import logging
+import random
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import typing
+
+import aiohttp
+import discord
+from discord.ext import commands
+
+# Optional orjson for the Java status payload — several times faster than
+# stdlib json on MOTD-heavy component trees, and it takes bytes directly.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except Exception:
+    _json_loads = json.loads
+
+from mcbot.config import (
+    TOKEN,
+    CHANNEL_ID,
+    MC_SERVER_HOST,
+    MC_SERVER_PORT,
+    MC_PROTOCOL,
+    CHECK_INTERVAL,
+    MAX_CHECK_INTERVAL,
+    STABLE_THRESHOLD,
+    RATE_LIMIT_SECONDS,
+    ANNOUNCE_BURST,
+    USE_EMBED,
+    LOG_LEVEL,
+)
+from mcbot.parsers import read_varint, split_bedrock_motd
+
+# Logging
+logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
+log = logging.getLogger("mc-status-bot")
+
+intents = discord.Intents.default()
+intents.guilds = True
+
+
+class StatusBot(commands.Bot):
+    """Bot with a long-keepalive REST connection pool.
+
+    The default keepalive is shorter than a slow poll cycle, so an idle bot
+    pays a fresh TLS handshake per announcement; keeping connections alive
+    across several CHECK_INTERVALs avoids that. The connector is built here
+    in login() rather than at import because aiohttp >= 3.10 refuses to
+    construct a TCPConnector outside a running event loop, and it has to be
+    installed before the HTTP session is created.
+    """
+
+    async def login(self, token: str) -> None:
+        self.http.connector = aiohttp.TCPConnector(
+            limit=10,
+            ttl_dns_cache=300,
+            keepalive_timeout=max(CHECK_INTERVAL * 3, 90),
+            enable_cleanup_closed=True,
+        )
+        await super().login(token)
+
+
+bot = StatusBot(command_prefix="!", intents=intents)
+
+@dataclass(slots=True)
+class MonitorState:
+    """Debounce and announce state for one monitored server.
+
+    The allowance/last_refill pair is the announcement token bucket: it
+    refills ANNOUNCE_BURST tokens per RATE_LIMIT_SECONDS, so short flap
+    storms can burst without dropping transitions while the long-run rate
+    stays bounded.
+    """
+    last_status: typing.Optional[str] = None  # "online" or "offline"
+    stable_count: int = 0
+    last_details: typing.Optional[dict] = None
+    allowance: float = float(ANNOUNCE_BURST)
+    last_refill: float = field(default_factory=time.monotonic)
+
+
+_state = MonitorState()
+
+
+# --- DNS cache: the tunnel hostname rarely changes, so resolve it once per TTL ---
+
+_DNS_TTL = 300.0
+_dns_cache: typing.Dict[typing.Tuple[str, int], typing.Tuple[str, float]] = {}
+
+
+async def _resolve(host: str, port: int, udp: bool = False, ttl: float = _DNS_TTL) -> str:
+    """Resolve host to an IP, caching the result for ttl seconds."""
+    key = (host, port)
+    now = time.monotonic()
+    cached = _dns_cache.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+    loop = asyncio.get_running_loop()
+    socktype = socket.SOCK_DGRAM if udp else socket.SOCK_STREAM
+    infos = await loop.getaddrinfo(host, port, type=socktype)
+    ip = infos[0][4][0]
+    _dns_cache[key] = (ip, now + ttl)
+    return ip
+
+
+def _dns_invalidate(host: str, port: int) -> None:
+    """Drop a cached entry so a rotated tunnel address is re-resolved next check."""
+    _dns_cache.pop((host, port), None)
+
+
+async def tcp_port_open(host: str, port: int, timeout: float = 5.0) -> bool:
+    """Simple asyncio TCP connect check (used as Java fallback)."""
+    try:
+        ip = await _resolve(host, port)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout=timeout)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        return True
+    except Exception as e:
+        log.debug("TCP check failed for %s:%s → %s", host, port, e)
+        _dns_invalidate(host, port)
+        return False
+
+
+# --- Native Bedrock ping (RakNet Unconnected Ping over UDP) ---
+
+_RAKNET_MAGIC = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+_CLIENT_GUID = random.getrandbits(64)
+
+
+class _BedrockPingProtocol(asyncio.DatagramProtocol):
+    """Collects the first Unconnected Pong (0x1C) datagram into a future."""
+
+    def __init__(self, fut: asyncio.Future):
+        self._fut = fut
+
+    def datagram_received(self, data, addr):
+        if data and data[0] == 0x1C and not self._fut.done():
+            self._fut.set_result(data)
+
+    def error_received(self, exc):
+        if not self._fut.done():
+            self._fut.set_exception(exc)
+
+    def connection_lost(self, exc):
+        if exc is not None and not self._fut.done():
+            self._fut.set_exception(exc)
+
+
+async def _bedrock_ping(host: str, port: int, timeout: float = 5.0) -> dict:
+    """Send a RakNet Unconnected Ping and parse the pong MOTD payload."""
+    loop = asyncio.get_running_loop()
+    ip = await _resolve(host, port, udp=True)
+    fut = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _BedrockPingProtocol(fut), remote_addr=(ip, port)
+    )
+    try:
+        start = time.monotonic()
+        ping = (
+            b"\x01"
+            + struct.pack(">Q", int(start * 1000) & 0xFFFFFFFFFFFFFFFF)
+            + _RAKNET_MAGIC
+            + struct.pack(">Q", _CLIENT_GUID)
+        )
+        transport.sendto(ping)
+        data = await asyncio.wait_for(fut, timeout=timeout)
+        latency = (time.monotonic() - start) * 1000.0
+    finally:
+        transport.close()
+    # Pong layout: id(1) + time(8) + server GUID(8) + magic(16) + strlen(2) + payload
+    payload = data[35:].decode("utf-8", errors="replace")
+    motd, players, max_players = split_bedrock_motd(payload)
+    return {"available": True, "players_online": players, "max_players": max_players, "motd": motd, "latency_ms": round(latency, 1)}
+
+
+# --- Native Java ping (Server List Ping over TCP) ---
+
+def _pack_varint(value: int) -> bytes:
+    """Encode an int as a Minecraft protocol varint."""
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        b = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+async def _read_stream_varint(reader: asyncio.StreamReader) -> int:
+    """Read a varint byte-by-byte from a stream."""
+    result = 0
+    for shift in range(0, 35, 7):
+        b = (await reader.readexactly(1))[0]
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result
+    raise ValueError("varint too long")
+
+
+def _motd_text(description) -> typing.Optional[str]:
+    """Flatten a Java chat-component description to plain text."""
+    if isinstance(description, str):
+        return description
+    if isinstance(description, dict):
+        text = description.get("text", "")
+        extra = description.get("extra")
+        if extra:
+            text += "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in extra)
+        return text or None
+    return None
+
+
+async def _java_ping(host: str, port: int, timeout: float = 5.0) -> dict:
+    """Perform a Server List Ping handshake and parse the status JSON."""
+    start = time.monotonic()
+    ip = await _resolve(host, port)
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout=timeout)
+    try:
+        # the handshake still carries the original hostname, not the resolved IP
+        host_b = host.encode("utf-8")
+        # Handshake: id 0x00, protocol -1, host, port, next state 1 (status)
+        handshake = b"\x00" + _pack_varint(-1) + _pack_varint(len(host_b)) + host_b + struct.pack(">H", port) + b"\x01"
+        # Follow with the Status Request packet (len 1, id 0x00)
+        writer.write(_pack_varint(len(handshake)) + handshake + b"\x01\x00")
+        await writer.drain()
+        length = await asyncio.wait_for(_read_stream_varint(reader), timeout=timeout)
+        body = await asyncio.wait_for(reader.readexactly(length), timeout=timeout)
+        latency = (time.monotonic() - start) * 1000.0
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+    packet_id, offset = read_varint(body, 0)
+    if packet_id != 0x00:
+        raise ValueError(f"unexpected status packet id 0x{packet_id:02x}")
+    json_len, offset = read_varint(body, offset)
+    status = _json_loads(body[offset:offset + json_len])
+    players = status.get("players", {})
+    return {
+        "available": True,
+        "players_online": players.get("online"),
+        "max_players": players.get("max"),
+        "motd": _motd_text(status.get("description")),
+        "latency_ms": round(latency, 1),
+    }
+
+
+async def query_java(host: str, port: int, timeout: float = 5.0) -> dict:
+    """Query Java edition via Server List Ping; fallback to TCP port test."""
+    try:
+        return await _java_ping(host, port, timeout=timeout)
+    except Exception as e:
+        log.debug("Java ping failed: %s", e)
+        _dns_invalidate(host, port)
+        # fall through to TCP check
+    # Fallback: simple TCP check
+    ok = await tcp_port_open(host, port, timeout=timeout)
+    return {"available": ok, "players_online": None, "max_players": None, "motd": None, "latency_ms": None}
+
+
+async def query_bedrock(host: str, port: int, timeout: float = 5.0) -> dict:
+    """Query Bedrock edition via RakNet Unconnected Ping."""
+    try:
+        return await _bedrock_ping(host, port, timeout=timeout)
+    except Exception as e:
+        log.debug("Bedrock ping failed: %s", e)
+        _dns_invalidate(host, port)
+        return {"available": False, "error": str(e)}
+
+
+# Winning edition per host:port, so auto mode probes only one edition on a
+# stable server; a failure evicts the entry and the next check probes both.
+_preferred_edition: typing.Dict[typing.Tuple[str, int], str] = {}
+
+
+async def get_status(protocol: str) -> dict:
+    """Return structured status dict based on protocol choice (auto/java/bedrock)."""
+    # Protocol resolution: auto attempt Bedrock then Java (or use configured)
+    if protocol == "auto":
+        key = (MC_SERVER_HOST, MC_SERVER_PORT)
+        preferred = _preferred_edition.get(key)
+        if preferred is not None:
+            query = query_bedrock if preferred == "bedrock" else query_java
+            res = await query(MC_SERVER_HOST, MC_SERVER_PORT)
+            if res.get("available"):
+                return {"edition": preferred, **res}
+            _preferred_edition.pop(key, None)
+        # Probe both editions concurrently and take the first available result.
+        probes = {
+            asyncio.create_task(query_bedrock(MC_SERVER_HOST, MC_SERVER_PORT)): "bedrock",
+            asyncio.create_task(query_java(MC_SERVER_HOST, MC_SERVER_PORT)): "java",
+        }
+        pending = set(probes)
+        res = {"available": False}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    task_res = task.result()
+                except Exception as e:
+                    task_res = {"available": False, "error": str(e)}
+                if task_res.get("available"):
+                    for other in pending:
+                        other.cancel()
+                    _preferred_edition[key] = probes[task]
+                    return {"edition": probes[task], **task_res}
+                res = task_res
+        # Both failed; keep the historical Bedrock-first guess for the report
+        return {"edition": "bedrock", **res}
+    elif protocol == "java":
+        res = await query_java(MC_SERVER_HOST, MC_SERVER_PORT)
+        return {"edition": "java", **res}
+    elif protocol == "bedrock":
+        res = await query_bedrock(MC_SERVER_HOST, MC_SERVER_PORT)
+        return {"edition": "bedrock", **res}
+    else:
+        raise ValueError("Unsupported protocol: " + protocol)
+
+
+def _embed_template(online: bool) -> discord.Embed:
+    """Build the static part of the status embed (title, color, host, footer)."""
+    title = "Server is ONLINE ✅" if online else "Server is OFFLINE ❌"
+    color = discord.Color.green() if online else discord.Color.red()
+    embed = discord.Embed(title=title, color=color)
+    embed.add_field(name="Host", value=f"{MC_SERVER_HOST}:{MC_SERVER_PORT}", inline=True)
+    embed.set_footer(text=f"Debounce: {STABLE_THRESHOLD} checks • RateLimit: {RATE_LIMIT_SECONDS}s")
+    return embed
+
+
+# Host/footer/title/color never change at runtime, so build them once and
+# only fill in the dynamic fields per announcement. Stored as dicts and
+# deep-copied per use: Embed.copy() is shallow and would let every call
+# append its dynamic fields to the shared template's field list.
+_EMBED_TEMPLATE_ONLINE = _embed_template(True).to_dict()
+_EMBED_TEMPLATE_OFFLINE = _embed_template(False).to_dict()
+
+# Same idea for the plain-text messages: host/port are frozen at startup,
+# so format the constant prefixes once and join only the dynamic parts.
+_ONLINE_PREFIX_TEMPLATE = "🟢 **Server is ONLINE!** ({edition})\nHost: " + f"{MC_SERVER_HOST}:{MC_SERVER_PORT}" + "\nTime: "
+_OFFLINE_PREFIX = f"🔴 **Server is OFFLINE!**\nHost: {MC_SERVER_HOST}:{MC_SERVER_PORT}\nTime: "
+
+
+def _format_status_text(online: bool, details: dict, ts: str) -> str:
+    """Build the plain-text (USE_EMBED=false) status message."""
+    if online:
+        parts = [_ONLINE_PREFIX_TEMPLATE.format(edition=details.get("edition")), ts]
+        players = details.get("players_online")
+        maxp = details.get("max_players")
+        if players is not None or maxp is not None:
+            parts.append(f"\nPlayers: {players}/{maxp}")
+        motd = details.get("motd")
+        if motd:
+            parts.append(f"\nMOTD: {motd}")
+    else:
+        parts = [_OFFLINE_PREFIX, ts]
+        err = details.get("error")
+        if err:
+            parts.append(f"\nError: {err}")
+    return "".join(parts)
+
+
+def make_embed(online: bool, details: dict) -> discord.Embed:
+    now = datetime.now(timezone.utc)
+    template = _EMBED_TEMPLATE_ONLINE if online else _EMBED_TEMPLATE_OFFLINE
+    embed = discord.Embed.from_dict(copy.deepcopy(template))
+    embed.timestamp = now
+    embed.add_field(name="Edition", value=details.get("edition", "unknown"), inline=True)
+    embed.add_field(name="Checked", value=now.strftime("%Y-%m-%d %H:%M:%S UTC"), inline=False)
+    if online:
+        players = details.get("players_online")
+        maxp = details.get("max_players")
+        if players is not None or maxp is not None:
+            embed.add_field(name="Players", value=f"{players}/{maxp}" if maxp else f"{players}", inline=True)
+        motd = details.get("motd")
+        if motd:
+            embed.add_field(name="MOTD", value=str(motd), inline=False)
+        latency = details.get("latency_ms")
+        if latency is not None:
+            embed.add_field(name="Ping (ms)", value=str(latency), inline=True)
+    else:
+        err = details.get("error")
+        if err:
+            embed.add_field(name="Error", value=str(err), inline=False)
+    return embed
+
+
+_checker_task: typing.Optional[asyncio.Task] = None
+_announce_task: typing.Optional[asyncio.Task] = None
+_channel_ref: typing.Optional[discord.abc.Messageable] = None
+
+# Outbox: check_server only enqueues announcements; a single consumer sends
+# them, waiting out the token bucket and coalescing anything that queued up
+# in the meantime so only the most recent state is ever posted.
+_outbox: asyncio.Queue = asyncio.Queue()
+
+# Failed sends are retried a few times before the announcement is abandoned.
+_SEND_RETRY_SECONDS = 30
+_MAX_SEND_ATTEMPTS = 3
+
+
+async def _retry_or_abandon(item: dict, exc: Exception) -> None:
+    """Requeue a failed announcement unless a newer one supersedes it or it
+    is out of attempts. Abandoning clears the announced-state marker so the
+    poll loop queues the transition again instead of silently losing it."""
+    if not _outbox.empty():
+        log.warning("send failed: %s; a newer announcement supersedes this one", exc)
+        return
+    item["attempts"] = item.get("attempts", 0) + 1
+    if item["attempts"] < _MAX_SEND_ATTEMPTS:
+        log.warning("send failed: %s; retrying in %ds", exc, _SEND_RETRY_SECONDS)
+        await asyncio.sleep(_SEND_RETRY_SECONDS)
+        if _outbox.empty():
+            _outbox.put_nowait(item)
+    else:
+        log.warning("send failed: %s; giving up after %d attempts", exc, item["attempts"])
+        _state.last_details = None
+
+
+async def _get_channel() -> discord.abc.Messageable:
+    """Return the announcement channel, resolving (and caching) it once."""
+    global _channel_ref
+    if _channel_ref is None:
+        _channel_ref = bot.get_channel(CHANNEL_ID) or await bot.fetch_channel(CHANNEL_ID)
+    return _channel_ref
+
+
+@bot.event
+async def on_ready():
+    global _checker_task, _announce_task, _channel_ref
+    log.info("Logged in as %s (ID:%s) — polling %s:%s (%s)", bot.user, bot.user.id, MC_SERVER_HOST, MC_SERVER_PORT, MC_PROTOCOL)
+    try:
+        await _get_channel()
+    except Exception as e:
+        log.error("Cannot resolve channel %s at startup: %s", CHANNEL_ID, e)
+    if _checker_task is None or _checker_task.done():
+        _checker_task = bot.loop.create_task(_check_loop())
+    if _announce_task is None or _announce_task.done():
+        _announce_task = bot.loop.create_task(_announce_worker())
+
+
+async def _check_loop():
+    """Background poll loop with adaptive backoff once the state is stable."""
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        try:
+            await check_server()
+        except Exception:
+            log.exception("Check loop iteration failed")
+        # After STABLE_THRESHOLD identical results, back off exponentially
+        # (capped); any state change resets the stability count and thus the interval.
+        exponent = min(max(0, _state.stable_count - STABLE_THRESHOLD), 10)
+        interval = min(CHECK_INTERVAL * 2 ** exponent, MAX_CHECK_INTERVAL)
+        log.debug("Next check in %ds (stable_count=%d)", interval, _state.stable_count)
+        await asyncio.sleep(interval)
+
+
+async def _announce_worker():
+    """Single consumer of the outbox: waits out the token bucket, then sends
+    only the most recently queued state so a backed-up queue never posts
+    stale transitions."""
+    global _channel_ref
+    await bot.wait_until_ready()
+    forbidden_streak = 0
+    while True:
+        latest = await _outbox.get()
+        # Refill the token bucket; defer (don't drop) when it is empty.
+        now_m = time.monotonic()
+        _state.allowance = min(float(ANNOUNCE_BURST), _state.allowance + (now_m - _state.last_refill) * ANNOUNCE_BURST / RATE_LIMIT_SECONDS)
+        _state.last_refill = now_m
+        if _state.allowance < 1.0:
+            wait = (1.0 - _state.allowance) * RATE_LIMIT_SECONDS / ANNOUNCE_BURST
+            log.info("Announcement deferred %.0fs by rate limit", wait)
+            await asyncio.sleep(wait)
+            _state.allowance = 1.0
+            _state.last_refill = time.monotonic()
+        # Coalesce whatever queued up while we waited.
+        while not _outbox.empty():
+            latest = _outbox.get_nowait()
+        try:
+            channel = await _get_channel()
+            if USE_EMBED:
+                await channel.send(embed=make_embed(latest["online"], latest["details"]))
+            else:
+                await channel.send(latest["text"])
+            _state.allowance -= 1.0
+            forbidden_streak = 0
+            log.info("Announced status %s to channel %s", latest["status"], CHANNEL_ID)
+        except discord.Forbidden as e:
+            _channel_ref = None
+            _state.last_details = None  # let the poll loop re-queue the transition
+            forbidden_streak += 1
+            log.error("Missing permission to send in channel %s (%s)", CHANNEL_ID, e)
+            if forbidden_streak >= 3:
+                # Permissions won't fix themselves; let the supervisor restart us
+                raise SystemExit(f"Persistently forbidden from channel {CHANNEL_ID}")
+        except discord.NotFound as e:
+            _channel_ref = None
+            await _retry_or_abandon(latest, e)
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Expected transient failures (5xx, timeouts) — no traceback spam
+            await _retry_or_abandon(latest, e)
+        except Exception:
+            log.exception("Failed to send announcement")
+
+
+_check_lock = asyncio.Lock()
+
+
+async def check_server(state: MonitorState = _state):
+    """Run one check, dropping the call if a previous one is still in flight
+    so two runs never mutate the debounce state concurrently."""
+    if _check_lock.locked():
+        log.warning("Previous check still running; dropping overlapping run")
+        return
+    async with _check_lock:
+        await _check_server_once(state)
+
+
+async def _check_server_once(state: MonitorState):
+    # Get status, capped below the base interval so a hung probe cannot
+    # outlive the cycle that started it
+    try:
+        details = await asyncio.wait_for(get_status(MC_PROTOCOL), timeout=max(1, CHECK_INTERVAL - 1))
+    except Exception as e:
+        log.exception("Status check failed: %s", e)
+        details = {"available": False, "error": str(e), "edition": "unknown"}
+
+    online = bool(details.get("available"))
+    current_status = "online" if online else "offline"
+
+    # Debounce: require STABLE_THRESHOLD consecutive identical results
+    if current_status == state.last_status:
+        state.stable_count += 1
+    else:
+        state.stable_count = 1  # first time we see this new state
+    log.debug("Status=%s stable_count=%d", current_status, state.stable_count)
+
+    # Only announce if stable enough
+    if state.stable_count >= STABLE_THRESHOLD:
+        # Announce only when status truly changed (different from last announced state)
+        if current_status != (state.last_details.get("announced_status") if state.last_details else None):
+            item = {"online": online, "status": current_status, "details": {**details, "announced_status": current_status}}
+            if not USE_EMBED:
+                # Only format a timestamp when we actually queue an announcement
+                ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                item["text"] = _format_status_text(online, details, ts)
+            _outbox.put_nowait(item)
+            log.debug("Queued announcement for status %s", current_status)
+            # mark announced status in last_details so that repeated announcements don't queue
+            state.last_details = {"announced_status": current_status, **details}
+        else:
+            log.debug("Status stable but already announced: %s", current_status)
+    else:
+        log.debug("Status not stable enough to announce (have %d need %d)", state.stable_count, STABLE_THRESHOLD)
+
+    state.last_status = current_status
+
+
+@bot.command(name="server")
+async def cmd_server(ctx):
+    """Manual command to immediately check the server and print status."""
+    try:
+        details = await get_status(MC_PROTOCOL)
+    except Exception as e:
+        details = {"available": False, "error": str(e), "edition": "unknown"}
+    online = bool(details.get("available"))
+    if USE_EMBED:
+        embed = make_embed(online, details)
+        await ctx.send(embed=embed)
+    else:
+        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        await ctx.send(_format_status_text(online, details, ts))
+
+
+def main():
+    try:
+        bot.run(TOKEN)
+    except KeyboardInterrupt:
+        log.info("Shutting down by user request")
+    except Exception:
+        log.exception("Bot terminated unexpectedly")
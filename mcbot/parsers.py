@@ -0,0 +1,42 @@
+"""Hot-path parsers for the native status pings.
+
+These run once per status packet. When numba is installed, the varint
+reader is JIT-compiled to native code (cache=True persists the compiled
+artifact so restarts skip the compile); otherwise the pure-Python version
+is used unchanged. numba is deliberately optional — it is a heavy install
+for a small bot, so it is only picked up when already present.
+"""
+import typing
+
+
+def _read_varint_py(buf: bytes, offset: int) -> typing.Tuple[int, int]:
+    """Read a Minecraft protocol varint from buf; returns (value, new_offset)."""
+    result = 0
+    for shift in range(0, 35, 7):
+        b = buf[offset]
+        offset += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, offset
+    raise ValueError("varint too long")
+
+
+# Optional numba JIT
+try:
+    import numba
+
+    read_varint = numba.njit(cache=True)(_read_varint_py)
+except Exception:
+    read_varint = _read_varint_py
+
+
+def split_bedrock_motd(payload: str) -> typing.Tuple[typing.Optional[str], typing.Optional[int], typing.Optional[int]]:
+    """Extract (motd, players_online, max_players) from a semicolon MOTD payload.
+
+    Payload layout: edition;motd;protocol;version;players;max;...
+    """
+    parts = payload.split(";")
+    motd = parts[1] if len(parts) > 1 else None
+    players = int(parts[4]) if len(parts) > 4 and parts[4].isdigit() else None
+    max_players = int(parts[5]) if len(parts) > 5 and parts[5].isdigit() else None
+    return motd, players, max_players